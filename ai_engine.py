@@ -1,14 +1,30 @@
+import re
 import ollama
 from ollama import Client
+from concurrent.futures import ThreadPoolExecutor
 
 class AIEngine:
-    def __init__(self, host="http://localhost:11434"):
+    PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+    SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+    def __init__(self, host="http://localhost:11434", chunk_chars=1500, max_parallel=4):
+        """
+        Args:
+            host (str): The Ollama server URL.
+            chunk_chars (int): Transcripts longer than this are split into chunks of
+                about this size, at paragraph or sentence boundaries.
+            max_parallel (int): The maximum number of chunks sent to Ollama at once.
+        """
         self.host = host
         self.client = Client(host=self.host)
+        self.chunk_chars = chunk_chars
+        self.max_parallel = max_parallel
 
     def process(self, text, system_prompt, model_name="llama3"):
         """
         Process the transcribed text through an LLM using the given system prompt.
+
+        Long transcripts are processed in chunks concurrently and reassembled in order.
         """
         if not text:
             return ""
@@ -17,25 +33,90 @@ class AIEngine:
         if not system_prompt or not system_prompt.strip():
             return text
 
-        try:
-            # Construct the message history
-            messages = [
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': text}
-            ]
+        chunks = self._split(text)
+        if len(chunks) > 1:
+            return self._process_chunks(chunks, system_prompt, model_name)
 
-            response = self.client.chat(model=model_name, messages=messages)
-            return response['message']['content']
+        try:
+            return self._chat(text, system_prompt, model_name)
 
         except Exception as e:
             print(f"AI Processing Error: {e}")
             # Fallback: return raw text if AI fails (e.g., Ollama not running)
             return f"[AI Error: {e}] \n\n{text}"
 
+    def _chat(self, text, system_prompt, model_name, context=None):
+        # Construct the message history
+        messages = [{'role': 'system', 'content': system_prompt}]
+        if context:
+            # The tail of the previous chunk keeps the style and wording coherent
+            # across chunk boundaries without being repeated in the output.
+            messages.append({
+                'role': 'system',
+                'content': (
+                    "The text continues a longer transcript that ended with: "
+                    f"\"{context}\". Do not repeat that part; only return the "
+                    "processed version of the new text."
+                )
+            })
+        messages.append({'role': 'user', 'content': text})
+
+        response = self.client.chat(model=model_name, messages=messages)
+        return response['message']['content']
+
+    def _process_chunks(self, chunks, system_prompt, model_name):
+        def run(index):
+            chunk = chunks[index][1]
+            context = self._last_sentence(chunks[index - 1][1]) if index else None
+            try:
+                return self._chat(chunk, system_prompt, model_name, context)
+            except Exception as e:
+                print(f"AI Processing Error in chunk {index + 1}/{len(chunks)}: {e}")
+                return chunk
+
+        workers = max(1, min(self.max_parallel, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run, range(len(chunks))))
+
+        # Every result keeps its own separator, so an empty result doesn't
+        # swallow the next one's; the leading separator is stripped once.
+        return "".join(
+            separator + result.strip() for (separator, _chunk), result in zip(chunks, results)
+        ).strip()
+
+    def _split(self, text):
+        """
+        Splits text into ``(separator, chunk)`` pairs of at most about
+        ``chunk_chars`` characters, preferring paragraph breaks and falling
+        back to sentence ends. ``separator`` is what joined the chunk to the
+        previous one.
+        """
+        if len(text) <= self.chunk_chars:
+            return [("", text)]
+
+        pieces = []
+        for paragraph in self.PARAGRAPH_BREAK.split(text.strip()):
+            if len(paragraph) <= self.chunk_chars:
+                pieces.append(("\n\n", paragraph))
+                continue
+            for position, sentence in enumerate(self.SENTENCE_END.split(paragraph)):
+                pieces.append(("\n\n" if position == 0 else " ", sentence))
+
+        chunks = []
+        for separator, piece in pieces:
+            if chunks and len(chunks[-1][1]) + len(separator) + len(piece) <= self.chunk_chars:
+                chunks[-1] = (chunks[-1][0], chunks[-1][1] + separator + piece)
+            else:
+                chunks.append((separator, piece))
+        return chunks
+
+    def _last_sentence(self, text):
+        return self.SENTENCE_END.split(text.strip())[-1]
+
     def list_models(self):
         try:
             models_info = self.client.list()
-            # The structure of models_info might vary slightly by version, 
+            # The structure of models_info might vary slightly by version,
             # usually it's {'models': [{'name': 'llama3:latest', ...}]}
             return [m['name'] for m in models_info.get('models', [])]
         except Exception:
@@ -0,0 +1,91 @@
+import queue
+import threading
+import numpy as np
+import pyaudio
+
+
+class ChimePlayer:
+    """
+    Plays the recording start/stop chimes.
+
+    The chimes are synthesized once with NumPy and kept as 16-bit PCM in
+    memory. They are played on a dedicated thread through one output stream
+    on the recorder's existing PyAudio instance, opened on first use and
+    kept open. Neither opening the device nor playback ever runs on the
+    hotkey thread, so it behaves the same on every platform and needs no
+    files.
+    """
+    CHIMES = {
+        "start": (523.25, 659.25),
+        "stop": (392.0, 293.66)
+    }
+
+    def __init__(self, pyaudio_instance, sample_rate=44100, duration=0.14, volume=0.4):
+        self.p = pyaudio_instance
+        self.sample_rate = sample_rate
+        self._sounds = {
+            kind: self._synthesize(freqs, duration, volume)
+            for kind, freqs in self.CHIMES.items()
+        }
+        self._stream = None
+        # Called from the playback thread if the output device can't be opened.
+        self.on_error = None
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _synthesize(self, freqs, duration, volume, attack=0.015, release=0.04):
+        t = np.arange(int(self.sample_rate * duration)) / self.sample_rate
+        envelope = np.minimum(1.0, np.minimum(t / attack, (duration - t) / release))
+        envelope = np.clip(envelope, 0.0, 1.0)
+        tone = np.sin(2 * np.pi * np.outer(freqs, t)).mean(axis=0)
+        samples = np.clip(tone * volume * envelope, -1.0, 1.0)
+        return (samples * 32767).astype(np.int16).tobytes()
+
+    def play(self, kind):
+        """
+        Queues a chime and returns immediately. Returns False for an unknown
+        chime.
+        """
+        if kind not in self._sounds:
+            return False
+        self._requests.put(kind)
+        return True
+
+    def _run(self):
+        while True:
+            kind = self._requests.get()
+            if kind is None:
+                break
+            try:
+                if self._stream is None:
+                    self._stream = self.p.open(
+                        format=pyaudio.paInt16,
+                        channels=1,
+                        rate=self.sample_rate,
+                        output=True
+                    )
+                elif self._stream.is_stopped():
+                    self._stream.start_stream()
+                self._stream.write(self._sounds[kind])
+                # Stopping waits for the buffered audio, then lets the device idle.
+                self._stream.stop_stream()
+            except Exception as exc:
+                print(f"Failed to play sound: {exc}")
+                self._close_stream()
+                if self.on_error:
+                    self.on_error(kind)
+        self._close_stream()
+
+    def _close_stream(self):
+        if self._stream is None:
+            return
+        try:
+            self._stream.close()
+        except Exception:
+            pass
+        self._stream = None
+
+    def close(self):
+        self._requests.put(None)
+        self._thread.join(timeout=1)
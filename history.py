@@ -0,0 +1,154 @@
+import re
+import time
+import queue
+import sqlite3
+import threading
+
+
+class HistoryStore:
+    """
+    Transcript history in an embedded SQLite database with a full-text index.
+
+    Records are queued by ``add`` and written by a background thread that
+    commits in batches, so saving history never blocks dictation. Searching
+    uses a separate connection on the calling thread; the database runs in
+    WAL mode so reads don't wait for the writer.
+
+    If the SQLite build lacks FTS5, search falls back to a LIKE scan.
+    """
+    COLUMNS = (
+        "created_at",
+        "text",
+        "raw_text",
+        "ai_processed",
+        "audio_fingerprint",
+        "model",
+        "audio_seconds",
+        "transcribe_seconds",
+        "ai_seconds",
+        "target_app"
+    )
+
+    def __init__(self, path="history.db", batch_size=20, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fts = True
+        self._reader = None
+        # Called from the writer thread after each commit of new records.
+        self.on_commit = None
+        self._queue = queue.Queue()
+        self._create_schema()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "id INTEGER PRIMARY KEY, created_at REAL, text TEXT, raw_text TEXT, "
+                "ai_processed INTEGER, audio_fingerprint TEXT, model TEXT, "
+                "audio_seconds REAL, transcribe_seconds REAL, ai_seconds REAL, target_app TEXT)"
+            )
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5("
+                    "text, raw_text, content='transcripts', content_rowid='id')"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS transcripts_ai AFTER INSERT ON transcripts BEGIN "
+                    "INSERT INTO transcripts_fts(rowid, text, raw_text) "
+                    "VALUES (new.id, new.text, new.raw_text); END"
+                )
+            except sqlite3.OperationalError as exc:
+                print(f"Full-text search unavailable, using plain search: {exc}")
+                self.fts = False
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add(self, text, **fields):
+        """
+        Queues a transcript for saving. ``fields`` may hold any of the other
+        ``COLUMNS``; ``created_at`` defaults to now.
+        """
+        record = {column: fields.get(column) for column in self.COLUMNS}
+        record["text"] = text
+        if record["created_at"] is None:
+            record["created_at"] = time.time()
+        self._queue.put(record)
+
+    def _run(self):
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        insert = f"INSERT INTO transcripts ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+        pending = 0
+        while True:
+            try:
+                record = self._queue.get(timeout=self.flush_interval if pending else None)
+            except queue.Empty:
+                pending = self._commit(conn, pending)
+                continue
+            if record is None:
+                break
+            try:
+                conn.execute(insert, [record[column] for column in self.COLUMNS])
+                pending += 1
+            except sqlite3.Error as exc:
+                print(f"Failed to save transcript: {exc}")
+            if pending >= self.batch_size:
+                pending = self._commit(conn, pending)
+        self._commit(conn, pending)
+        conn.close()
+
+    def _commit(self, conn, pending):
+        conn.commit()
+        if pending and self.on_commit:
+            try:
+                self.on_commit()
+            except Exception as exc:
+                print(f"Error after saving transcripts: {exc}")
+        return 0
+
+    def search(self, query="", limit=50):
+        """
+        Returns the most recent transcripts matching ``query`` (all words, as
+        prefixes), newest first, as dicts. An empty query lists the latest.
+        """
+        if self._reader is None:
+            self._reader = self._connect()
+            self._reader.row_factory = sqlite3.Row
+        words = re.findall(r"\w+", query)
+        columns = ", ".join(f"t.{column}" for column in ("id",) + self.COLUMNS)
+        if not words:
+            sql = f"SELECT {columns} FROM transcripts t ORDER BY t.id DESC LIMIT ?"
+            params = [limit]
+        elif self.fts:
+            match = " ".join(f'"{word}"*' for word in words)
+            sql = (
+                f"SELECT {columns} FROM transcripts_fts f JOIN transcripts t ON t.id = f.rowid "
+                "WHERE transcripts_fts MATCH ? ORDER BY t.id DESC LIMIT ?"
+            )
+            params = [match, limit]
+        else:
+            conditions = " AND ".join("(t.text LIKE ? OR t.raw_text LIKE ?)" for _ in words)
+            sql = f"SELECT {columns} FROM transcripts t WHERE {conditions} ORDER BY t.id DESC LIMIT ?"
+            params = [value for word in words for value in (f"%{word}%", f"%{word}%")] + [limit]
+        try:
+            return [dict(row) for row in self._reader.execute(sql, params)]
+        except sqlite3.Error as exc:
+            print(f"History search failed: {exc}")
+            return []
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
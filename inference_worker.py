@@ -0,0 +1,235 @@
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def _read_audio(name, lengths):
+    # The parent creates and unlinks the block; this side only maps it.
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        samples = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        audios = []
+        offset = 0
+        for length in lengths:
+            audios.append(samples[offset:offset + length].copy())
+            offset += length
+        del samples
+    finally:
+        shm.close()
+    return audios
+
+
+def _serve(conn, model_size, device, compute_type, model_store):
+    """
+    Entry point of the inference process. Loads the model and answers
+    requests from the parent until told to close or the pipe is gone.
+    ``load`` and ``unload`` requests get no reply.
+    """
+    try:
+        from transcriber import Transcriber
+        transcriber = Transcriber(
+            model_size=model_size,
+            device=device,
+            compute_type=compute_type,
+            model_store=model_store
+        )
+    except Exception as exc:
+        load_error = f"Failed to load model '{model_size}': {exc}"
+        transcriber = None
+    else:
+        load_error = None
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        op = request[0]
+        if op == "close":
+            break
+        if op in ("load", "unload"):
+            if transcriber is not None:
+                try:
+                    getattr(transcriber, op)()
+                except Exception as exc:
+                    print(f"Inference worker failed to {op} the model: {exc}")
+            continue
+        if transcriber is None:
+            conn.send(("error", load_error))
+            continue
+        try:
+            if op == "transcribe_stream":
+                _, name, length, language, clip_timestamps = request
+                audio = _read_audio(name, [length])[0]
+                for text in transcriber.transcribe_stream(audio, language, clip_timestamps):
+                    conn.send(("segment", text))
+                conn.send(("done", None))
+            elif op == "transcribe_batch":
+                _, name, lengths, language = request
+                audios = _read_audio(name, lengths)
+                conn.send(("done", transcriber.transcribe_batch(audios, language)))
+            else:
+                conn.send(("error", f"Unknown request '{op}'"))
+        except Exception as exc:
+            conn.send(("error", str(exc)))
+    conn.close()
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+class RemoteTranscriber:
+    """
+    Runs a ``Transcriber`` in a separate process and exposes the same
+    interface.
+
+    Decoding then no longer competes for the GIL with the audio callback,
+    the hotkey listener and the Tk loop. Audio is handed over through a
+    shared-memory block instead of being pickled into the pipe, and the
+    process is restarted automatically if it dies.
+    """
+    def __init__(self, model_size="base", device="auto", compute_type="default", model_store=None):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.model_store = model_store
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._spawn()
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_serve,
+            args=(child_conn, self.model_size, self.device, self.compute_type, self.model_store),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def _respawn(self):
+        print("Inference worker stopped unexpectedly. Restarting it...")
+        try:
+            self._conn.close()
+        except OSError:
+            pass
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._spawn()
+
+    def _share(self, audios):
+        lengths = [len(audio) for audio in audios]
+        shm = shared_memory.SharedMemory(create=True, size=max(1, sum(lengths)) * 4)
+        samples = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        offset = 0
+        for audio in audios:
+            samples[offset:offset + len(audio)] = audio
+            offset += len(audio)
+        del samples
+        return shm, lengths
+
+    def _request(self, request):
+        """
+        Sends a request and yields the replies until it is done. If the process
+        died before replying, it is restarted and the request sent once more.
+        """
+        for attempt in range(2):
+            replied = False
+            done = False
+            try:
+                if not self._process.is_alive():
+                    raise WorkerCrashed()
+                self._conn.send(request)
+                try:
+                    while True:
+                        kind, payload = self._conn.recv()
+                        replied = True
+                        if kind == "error":
+                            done = True
+                            raise RuntimeError(payload)
+                        done = kind == "done"
+                        yield kind, payload
+                        if done:
+                            return
+                finally:
+                    if replied and not done:
+                        self._drain()
+            except (WorkerCrashed, EOFError, OSError):
+                self._respawn()
+                if replied or attempt:
+                    raise WorkerCrashed("The inference worker crashed during transcription.")
+
+    def _drain(self):
+        # The caller stopped reading early; discard the rest of the replies so
+        # they aren't mistaken for the answer to the next request.
+        try:
+            while self._conn.recv()[0] not in ("done", "error"):
+                pass
+        except (EOFError, OSError):
+            pass
+
+    def _load(self, audio):
+        if isinstance(audio, str):
+            from faster_whisper.audio import decode_audio
+            audio = decode_audio(audio, sampling_rate=16000)
+        return np.asarray(audio, dtype=np.float32)
+
+    def load(self):
+        self._notify("load")
+
+    def unload(self):
+        self._notify("unload")
+
+    def _notify(self, op):
+        with self._lock:
+            if not self._process.is_alive():
+                return
+            try:
+                self._conn.send((op,))
+            except OSError:
+                pass
+
+    def transcribe(self, audio, language=None, clip_timestamps=None):
+        transcription = "".join(self.transcribe_stream(audio, language, clip_timestamps))
+        return transcription.strip()
+
+    def transcribe_stream(self, audio, language=None, clip_timestamps=None):
+        with self._lock:
+            shm, lengths = self._share([self._load(audio)])
+            try:
+                request = ("transcribe_stream", shm.name, lengths[0], language, clip_timestamps)
+                for kind, payload in self._request(request):
+                    if kind == "segment":
+                        yield payload
+            finally:
+                shm.close()
+                shm.unlink()
+
+    def transcribe_batch(self, audios, language=None):
+        with self._lock:
+            shm, lengths = self._share([self._load(audio) for audio in audios])
+            try:
+                request = ("transcribe_batch", shm.name, lengths, language)
+                for kind, payload in self._request(request):
+                    if kind == "done":
+                        return payload
+            finally:
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.send(("close",))
+            except OSError:
+                pass
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.kill()
+            self._conn.close()
@@ -1,42 +1,206 @@
 import sys
 import os
+import re
 import json
-import platform
 import threading
-import math
-import tempfile
-import wave
-import pyperclip
+import time
+import queue
+import hashlib
+import collections
 from pynput import keyboard
 
-try:
-    import winsound
-except ImportError:
-    winsound = None
-
-from recorder import AudioRecorder
+from recorder import AudioRecorder, pcm_to_float
 from transcriber import Transcriber
-from ui import SettingsWindow, RecordingIndicator
+from inference_worker import RemoteTranscriber
+from model_store import ModelStore
+from audio_cues import ChimePlayer
+from ai_engine import AIEngine
+from output import OutputRouter, ClipboardPaster, KeyboardTyper, active_application
+from history import HistoryStore
+from profiler import SamplingProfiler
+from ui import SettingsWindow, RecordingIndicator, UIEventBus
 
 
 class Worker(threading.Thread):
     """
     Worker thread for transcription to avoid blocking the UI.
+
+    Jobs are processed one at a time in submission order, so dictations are
+    delivered to ``on_done`` in the order they were recorded. Jobs submitted
+    with the ``progressive`` option also pass each completed sentence to
+    ``on_partial`` as soon as it is decoded.
+
+    Short clips that are queued together (quick successive dictations or
+    hands-free utterances) are collected for up to ``batch_window_ms`` and
+    transcribed with a single batched model call.
+
+    ``on_done`` also receives a dict with the raw transcript, the audio
+    length, the time spent transcribing and in AI processing, and a short
+    fingerprint of the audio, for the transcript history.
     """
-    def __init__(self, transcriber, audio_path, language, on_done):
+    SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+    def __init__(self, ai_engine, on_done, on_partial=None, batch_window_ms=5, max_batch_size=8):
         super().__init__(daemon=True)
-        self.transcriber = transcriber
-        self.audio_path = audio_path
-        self.language = language
+        self.ai_engine = ai_engine
         self.on_done = on_done
+        self.on_partial = on_partial
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.jobs = queue.Queue()
+        self._held = []
+
+    def submit(self, transcriber, audio, language, options, clip_timestamps=None):
+        self.jobs.put((transcriber, audio, language, options, clip_timestamps))
+
+    def call(self, func):
+        """
+        Runs ``func`` on the worker thread once the jobs queued before it are done.
+        """
+        self.jobs.put(func)
+
+    def stop(self):
+        self.jobs.put(None)
 
     def run(self):
+        while True:
+            batch = self._next_batch()
+            if batch[0] is None:
+                break
+            if callable(batch[0]):
+                batch[0]()
+                continue
+            if len(batch) > 1:
+                self._run_batch(batch)
+                continue
+            transcriber, audio, language, options, clip_timestamps = batch[0]
+            progressive = bool(options.get("progressive") and self.on_partial)
+            info = self._job_info(audio)
+            try:
+                if progressive:
+                    text = self._transcribe_progressively(
+                        transcriber, audio, language, options, clip_timestamps, info
+                    )
+                else:
+                    started = time.monotonic()
+                    info["raw_text"] = transcriber.transcribe(audio, language, clip_timestamps)
+                    info["transcribe_seconds"] = time.monotonic() - started
+                    text = self._post_process(info["raw_text"], options, info)
+            except Exception as exc:
+                print(f"Error during processing: {exc}")
+                text = ""
+            self.on_done(text, progressive, info)
+
+    def _job_info(self, audio):
+        if isinstance(audio, str):
+            data = audio.encode("utf-8")
+            audio_seconds = None
+        else:
+            data = audio.tobytes()
+            audio_seconds = len(audio) / 16000.0
+        return {
+            "raw_text": "",
+            "ai_processed": False,
+            "audio_fingerprint": hashlib.blake2b(data, digest_size=8).hexdigest(),
+            "audio_seconds": audio_seconds,
+            "transcribe_seconds": 0.0,
+            "ai_seconds": 0.0
+        }
+
+    def _batchable(self, job):
+        transcriber, _audio, _language, options, clip_timestamps = job
+        return (
+            hasattr(transcriber, "transcribe_batch")
+            and not clip_timestamps
+            and not (options.get("progressive") and self.on_partial)
+        )
+
+    def _next_batch(self):
+        job = self._held.pop() if self._held else self.jobs.get()
+        batch = [job]
+        if job is None or callable(job) or not self._batchable(job):
+            return batch
+        deadline = time.monotonic() + self.batch_window_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            try:
+                candidate = self.jobs.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if (
+                candidate is not None
+                and not callable(candidate)
+                and self._batchable(candidate)
+                and candidate[0] is job[0]
+                and candidate[2] == job[2]
+            ):
+                batch.append(candidate)
+            else:
+                # Keep it for the next round so submission order is preserved.
+                self._held.append(candidate)
+                break
+        return batch
+
+    def _run_batch(self, batch):
+        transcriber, language = batch[0][0], batch[0][2]
+        audios = [job[1] for job in batch]
+        started = time.monotonic()
         try:
-            text = self.transcriber.transcribe(self.audio_path, self.language)
+            texts = transcriber.transcribe_batch(audios, language)
         except Exception as exc:
-            print(f"Error during processing: {exc}")
-            text = ""
-        self.on_done(text)
+            print(f"Error during batched processing: {exc}")
+            texts = [""] * len(batch)
+        # The clips were decoded together, so each is charged an equal share.
+        elapsed = (time.monotonic() - started) / len(batch)
+        for job, text in zip(batch, texts):
+            info = self._job_info(job[1])
+            info["raw_text"] = text
+            info["transcribe_seconds"] = elapsed
+            try:
+                text = self._post_process(text, job[3], info)
+            except Exception as exc:
+                print(f"Error during processing: {exc}")
+                text = ""
+            self.on_done(text, False, info)
+
+    def _transcribe_progressively(self, transcriber, audio, language, options, clip_timestamps, info):
+        sentences = []
+        pending = ""
+        raw_text = ""
+        started = time.monotonic()
+        for segment_text in transcriber.transcribe_stream(audio, language, clip_timestamps):
+            raw_text += segment_text
+            pending += segment_text
+            parts = self.SENTENCE_END.split(pending)
+            pending = parts.pop()
+            if pending.rstrip().endswith((".", "!", "?")):
+                parts.append(pending)
+                pending = ""
+            for part in parts:
+                self._emit_sentence(part, options, sentences, info)
+        self._emit_sentence(pending, options, sentences, info)
+        info["raw_text"] = raw_text.strip()
+        # AI processing is interleaved with decoding; count it only once.
+        info["transcribe_seconds"] = time.monotonic() - started - info["ai_seconds"]
+        return " ".join(sentences)
+
+    def _emit_sentence(self, sentence, options, sentences, info):
+        sentence = self._post_process(sentence.strip(), options, info).strip()
+        if not sentence:
+            return
+        self.on_partial(sentence if not sentences else " " + sentence)
+        sentences.append(sentence)
+
+    def _post_process(self, text, options, info):
+        if text and options.get("ai_enabled"):
+            started = time.monotonic()
+            text = self.ai_engine.process(
+                text,
+                options.get("ai_system_prompt"),
+                options.get("ai_model") or "llama3"
+            )
+            info["ai_seconds"] += time.monotonic() - started
+            info["ai_processed"] = True
+        return text
 
 
 class SuperWhisperApp:
@@ -44,25 +208,77 @@ class SuperWhisperApp:
         self.settings_file = "settings.json"
         self.load_settings()
         self._ensure_icon()
-        self._sound_paths = {}
 
         self.settings_window = SettingsWindow(self.settings)
         self.settings_window.bind_settings_changed(self.handle_settings_change)
         self.settings_window.bind_restart_requested(self.restart_app)
         self.settings_window.bind_close(self.quit_app)
 
+        # The hotkey, audio and worker threads reach the UI only through this.
+        self.events = UIEventBus(self.settings_window)
+        self.events.subscribe("call", lambda func: func())
+        self.events.subscribe("recording", self._on_recording_changed)
+
         self.recorder = AudioRecorder()
+        self.recorder.on_level = self._on_audio_level
+        self.chimes = ChimePlayer(self.recorder.p)
+        self.chimes.on_error = lambda kind: self.events.post("call", self._ring_bell)
+        self.settings_window.set_input_devices(
+            device["name"] for device in self.recorder.list_input_devices()
+        )
         self.transcriber = None
         self.ai_engine = AIEngine()
         self.indicator = RecordingIndicator(self.settings_window)
+        self.events.subscribe("level", lambda level: self.indicator.set_level(*level))
+        self._overlay_text = ""
+        self.output = OutputRouter(self.settings_window)
+        self.history = self._open_history()
 
         self.is_recording = False
         self.hotkey_listener = None
-        self.worker = None
+        self._idle_timer = None
+        self._partial_backend = None
+        # Whether each queued dictation is a hands-free utterance, in order.
+        self._dictations = collections.deque()
+        self._utterance_emitted = False
+        self.worker = Worker(self.ai_engine, self._on_worker_done, self._on_worker_partial)
+        self.worker.start()
+        self.profiler = SamplingProfiler(focus=[
+            Worker.run,
+            Transcriber.transcribe,
+            AudioRecorder.stop_recording,
+            AudioRecorder.stop_recording_pcm,
+            AIEngine.process,
+            # Chunks of long transcripts are sent from a thread pool.
+            AIEngine._chat,
+            SuperWhisperApp.paste_text,
+            SuperWhisperApp.on_partial_transcription,
+            # Outputs may be delivered later, from the router's queue or the
+            # typing thread.
+            OutputRouter._drain,
+            ClipboardPaster._paste,
+            ClipboardPaster._restore,
+            KeyboardTyper._type
+        ])
+        self.settings_window.bind_profile_requested(self.arm_profiler)
 
         self.apply_settings(self.settings)
         self.start_hotkey_listener()
 
+    def _open_history(self):
+        if not self.settings.get("history_enabled", True):
+            return None
+        try:
+            history = HistoryStore(self.settings.get("history_path", "history.db"))
+        except Exception as exc:
+            print(f"Failed to open transcript history: {exc}")
+            return None
+        history.on_commit = lambda: self._schedule_ui(self.settings_window.refresh_history)
+        self.settings_window.set_history_source(history.search)
+        self.settings_window.bind_history_copy(self.output.clipboard.copy)
+        self.settings_window.bind_history_paste(self._paste_from_history)
+        return history
+
     def _ensure_icon(self):
         if os.path.exists("icon.png"):
             return
@@ -84,7 +300,24 @@ class SuperWhisperApp:
                 "hotkey": "<ctrl>+<shift>+v",
                 "auto_paste": True,
                 "play_sounds": True,
-                "language": "en"
+                "language": "en",
+                "input_device": None,
+                "output_backend": "clipboard",
+                "output_rules": {},
+                "inference_process": False,
+                "idle_unload_minutes": 30,
+                "model_store_dir": "models",
+                "progressive_output": False,
+                "continuous_mode": False,
+                "vad_hangover_ms": 600,
+                "min_utterance_ms": 300,
+                "max_utterance_ms": 15000,
+                "history_enabled": True,
+                "history_path": "history.db",
+                "profiler_hotkey": "",
+                "profiler_dictations": 5,
+                "profiler_interval_ms": 5,
+                "profiler_dir": "profiles"
             }
 
     def save_settings(self, new_settings):
@@ -94,20 +327,66 @@ class SuperWhisperApp:
 
     def apply_settings(self, settings):
         current_model = settings.get("model_size", "base")
-        if not self.transcriber or self.transcriber.model_size != current_model:
+        out_of_process = settings.get("inference_process", False)
+        if (
+            not self.transcriber
+            or self.transcriber.model_size != current_model
+            or isinstance(self.transcriber, RemoteTranscriber) != out_of_process
+        ):
             print(f"Loading model: {current_model}")
-            self.transcriber = Transcriber(model_size=current_model)
+            self._retire_transcriber()
+            store_dir = settings.get("model_store_dir", "models")
+            model_store = ModelStore(store_dir) if store_dir else None
+            if out_of_process:
+                self.transcriber = RemoteTranscriber(model_size=current_model, model_store=model_store)
+            else:
+                self.transcriber = Transcriber(model_size=current_model, model_store=model_store)
+        self.recorder.set_input_device(settings.get("input_device"))
+        self.output.configure(settings)
+        self.ai_engine.chunk_chars = settings.get("ai_chunk_chars", 1500)
+        self.ai_engine.max_parallel = settings.get("ai_max_parallel", 4)
+        self.profiler.interval_ms = settings.get("profiler_interval_ms", 5)
+        self.profiler.output_dir = settings.get("profiler_dir", "profiles")
         self.settings = settings
+        self._reset_idle_timer()
+
+    def _reset_idle_timer(self):
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        minutes = self.settings.get("idle_unload_minutes", 30)
+        if not minutes:
+            return
+        self._idle_timer = threading.Timer(minutes * 60, self._unload_idle_model)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _unload_idle_model(self):
+        print("Model idle. Unloading it until the next dictation.")
+        self.worker.call(self.transcriber.unload)
+
+    def _preload_model(self):
+        # Reloading an idle-unloaded model overlaps with the recording.
+        self.worker.call(self.transcriber.load)
+        self._reset_idle_timer()
+
+    def _retire_transcriber(self):
+        # Dictations already queued still use the old transcriber, so a worker
+        # process is only shut down after them.
+        if isinstance(self.transcriber, RemoteTranscriber):
+            self.worker.call(self.transcriber.close)
 
     def start_hotkey_listener(self):
         if self.hotkey_listener:
             self.hotkey_listener.stop()
 
         hotkey_str = self.settings.get("hotkey", "<ctrl>+<shift>+v")
+        hotkeys = {self.format_hotkey_for_pynput(hotkey_str): self.on_hotkey_activated}
+        profiler_hotkey = self.settings.get("profiler_hotkey")
+        if profiler_hotkey:
+            hotkeys[self.format_hotkey_for_pynput(profiler_hotkey)] = self.arm_profiler
         try:
-            self.hotkey_listener = keyboard.GlobalHotKeys({
-                self.format_hotkey_for_pynput(hotkey_str): self.on_hotkey_activated
-            })
+            self.hotkey_listener = keyboard.GlobalHotKeys(hotkeys)
             self.hotkey_listener.start()
             print(f"Hotkey '{hotkey_str}' is set.")
         except Exception as exc:
@@ -134,81 +413,198 @@ class SuperWhisperApp:
         return "+".join(formatted_parts)
 
     def on_hotkey_activated(self):
-        if not self.is_recording:
-            self.start_recording()
+        if self.is_recording:
+            if self.recorder.listening:
+                self.stop_listening()
+            else:
+                self.stop_and_transcribe()
+        elif self.settings.get("continuous_mode", False):
+            self.start_listening()
         else:
-            self.stop_and_transcribe()
+            self.start_recording()
 
     def start_recording(self):
         print("Starting recording...")
+        self._preload_model()
+        if not self.recorder.start_recording():
+            self._report_input_failure()
+            return
         self.is_recording = True
-        self.recorder.start_recording()
-        self.indicator.show_indicator()
+        self.events.post("recording", True, coalesce=True)
         if self.settings.get("play_sounds", True):
             self._play_sound("start")
 
+    def _report_input_failure(self):
+        # Called from the hotkey thread; the bell is the only cue, since no
+        # overlay or chime is shown for a recording that never started.
+        print("Could not open the microphone. Check the input device in the settings.")
+        self.events.post("call", self._ring_bell)
+
     def stop_and_transcribe(self):
         print("Stopping recording...")
         self.is_recording = False
-        self.indicator.hide()
+        # With progressive output the streamed text is shown in the overlay,
+        # so it stays up until the dictation has been delivered.
+        self.events.post(
+            "recording", "transcribing" if self._progressive() else False, coalesce=True
+        )
         if self.settings.get("play_sounds", True):
             self._play_sound("stop")
 
-        audio_file = self.recorder.stop_recording("temp_recording.wav")
-        if not audio_file:
+        self.profiler.begin()
+        pcm_data = self.recorder.stop_recording_pcm()
+        if not pcm_data:
             print("No speech detected.")
+            self.profiler.cancel()
+            self.events.post("recording", False, coalesce=True)
             return
 
-        print(f"Audio saved to {audio_file}. Transcribing...")
-        self.worker = Worker(
+        print("Transcribing...")
+        self._submit(pcm_to_float(pcm_data), self.recorder.speech_regions)
+
+    def start_listening(self):
+        print("Listening for speech...")
+        self._preload_model()
+        self._utterance_emitted = False
+        started = self.recorder.start_listening(
+            self._on_utterance,
+            hangover_ms=self.settings.get("vad_hangover_ms", 600),
+            min_utterance_ms=self.settings.get("min_utterance_ms", 300),
+            max_utterance_ms=self.settings.get("max_utterance_ms", 15000)
+        )
+        if not started:
+            self._report_input_failure()
+            return
+        self.is_recording = True
+        self.events.post("recording", True, coalesce=True)
+        if self.settings.get("play_sounds", True):
+            self._play_sound("start")
+
+    def stop_listening(self):
+        print("Stopped listening.")
+        self.is_recording = False
+        self.events.post("recording", False, coalesce=True)
+        if self.settings.get("play_sounds", True):
+            self._play_sound("stop")
+        self.recorder.stop_listening()
+
+    def _on_utterance(self, pcm_data):
+        print("Utterance detected. Transcribing...")
+        self.profiler.begin()
+        self._submit(pcm_to_float(pcm_data), utterance=True)
+
+    def _submit(self, audio, clip_timestamps=None, utterance=False):
+        self._dictations.append(utterance)
+        self.worker.submit(
             self.transcriber,
-            audio_file,
+            audio,
             self.settings.get("language"),
-            self.ai_engine,
             {
                 "ai_enabled": self.settings.get("ai_enabled"),
                 "ai_system_prompt": self.settings.get("ai_system_prompt"),
-                "ai_model": self.settings.get("ai_model")
+                "ai_model": self.settings.get("ai_model"),
+                "progressive": self._progressive()
             },
-            self._on_worker_done
+            clip_timestamps
         )
-        self.worker.start()
 
-    def _on_worker_done(self, text):
-        self._schedule_ui(lambda: self.on_transcription_finished(text))
+    def _progressive(self):
+        return bool(
+            self.settings.get("progressive_output", False)
+            and self.settings.get("auto_paste", True)
+        )
+
+    def _on_recording_changed(self, recording):
+        if recording == "transcribing":
+            self.indicator.show_transcribing()
+        elif recording:
+            self._overlay_text = ""
+            self.indicator.show_indicator()
+        else:
+            self.indicator.hide()
+
+    def _on_audio_level(self, rms, is_speech):
+        self.events.post("level", (rms, is_speech), coalesce=True)
+
+    def _show_overlay_text(self, text):
+        self._overlay_text += text
+        self.indicator.set_text(self._overlay_text)
+
+    def _on_worker_partial(self, text):
+        self._schedule_ui(lambda: self.on_partial_transcription(text))
 
-    def on_transcription_finished(self, text):
+    def _on_worker_done(self, text, delivered=False, info=None):
+        self._schedule_ui(lambda: self.on_transcription_finished(text, delivered, info))
+
+    def on_partial_transcription(self, text):
+        if self._partial_backend is None:
+            text = self._separate(text)
+        # Keep every sentence of a dictation on the same output backend.
+        self._partial_backend = self.output.write(text, self._partial_backend)
+        self._show_overlay_text(text)
+
+    def on_transcription_finished(self, text, delivered=False, info=None):
+        self._partial_backend = None
+        self._reset_idle_timer()
+        try:
+            self._deliver(text, delivered, info)
+        finally:
+            if self._dictations:
+                self._dictations.popleft()
+            if not self.is_recording and not self._dictations:
+                # The overlay was kept up for progressive output.
+                self.indicator.hide()
+            # The profile covers the output too, so it ends once that is done.
+            self.output.when_idle(self.profiler.end)
+
+    def _separate(self, text):
+        # Utterances of one hands-free session are output back to back, so
+        # every one after the first needs a space in front.
+        if self._dictations and self._dictations[0]:
+            if self._utterance_emitted:
+                text = " " + text
+            self._utterance_emitted = True
+        return text
+
+    def _deliver(self, text, delivered, info):
         if not text:
             print("Transcription was empty.")
             return
 
         print(f"Transcription: {text}")
+        self._record_history(text, info or {})
+        if delivered:
+            return
+        if self.recorder.listening:
+            self._show_overlay_text(text if not self._overlay_text else " " + text)
 
         if self.settings.get("auto_paste", True):
-            self.paste_text(text)
+            self.paste_text(self._separate(text))
         else:
-            pyperclip.copy(text)
+            self.output.clipboard.copy(text)
             print("Copied to clipboard.")
 
-    def paste_text(self, text):
-        try:
-            original_clipboard = pyperclip.paste()
-        except pyperclip.PyperclipException:
-            original_clipboard = ""
-
-        pyperclip.copy(text)
+    def _record_history(self, text, info):
+        if not self.history:
+            return
+        self.history.add(
+            text,
+            model=self.transcriber.model_size,
+            target_app=active_application(),
+            **info
+        )
 
-        controller = keyboard.Controller()
-        paste_key = keyboard.Key.ctrl
-        if platform.system() == "Darwin":
-            paste_key = keyboard.Key.cmd
+    def arm_profiler(self):
+        self.profiler.arm(self.settings.get("profiler_dictations", 5))
 
-        with controller.pressed(paste_key):
-            controller.press("v")
-            controller.release("v")
+    def _paste_from_history(self, text):
+        # Hand focus back to the window the text is meant for before pasting.
+        self.settings_window.iconify()
+        self._schedule_ui(lambda: self.paste_text(text), delay_ms=300)
 
-        self._schedule_ui(lambda: pyperclip.copy(original_clipboard), delay_ms=100)
-        print("Pasted text and restored clipboard.")
+    def paste_text(self, text):
+        backend = self.output.write(text)
+        print(f"Sent text to the {backend} output.")
 
     def handle_settings_change(self, new_settings):
         self.save_settings(new_settings)
@@ -225,79 +621,50 @@ class SuperWhisperApp:
         self._schedule_ui(self._do_restart, delay_ms=100)
 
     def _do_restart(self):
+        # exec skips all cleanup, so save pending history and stop the
+        # inference process first.
+        if self.history:
+            self.history.close()
+        if isinstance(self.transcriber, RemoteTranscriber):
+            self.transcriber.close()
         os.execl(sys.executable, sys.executable, *sys.argv)
 
     def quit_app(self):
         print("Quitting application.")
         if self.hotkey_listener:
             self.hotkey_listener.stop()
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        if self.recorder.listening:
+            self.recorder.stop_listening()
+        self._retire_transcriber()
+        self.worker.stop()
+        self.chimes.close()
+        if self.history:
+            self.history.close()
+        self.events.stop()
         self.settings_window.destroy()
 
     def _schedule_ui(self, func, delay_ms=0):
-        if self.settings_window:
-            self.settings_window.after(delay_ms, func)
+        # Safe from any thread: the event bus runs ``func`` on the Tk thread.
+        if delay_ms:
+            self.events.post("call", lambda: self.settings_window.after(delay_ms, func))
         else:
-            if delay_ms:
-                timer = threading.Timer(delay_ms / 1000.0, func)
-                timer.daemon = True
-                timer.start()
-            else:
-                func()
+            self.events.post("call", func)
 
     def _play_sound(self, kind):
-        if winsound and os.name == "nt":
-            path = self._ensure_sound_file(kind)
-            if path:
-                winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
-                return
+        # Only queues the chime, so it is called straight from the hotkey thread.
+        if self.chimes.play(kind):
             return
+        self.events.post("call", self._ring_bell)
+
+    def _ring_bell(self):
         try:
             self.settings_window.bell()
         except Exception:
             sys.stdout.write("\a")
             sys.stdout.flush()
 
-    def _ensure_sound_file(self, kind):
-        if kind in self._sound_paths and os.path.exists(self._sound_paths[kind]):
-            return self._sound_paths[kind]
-
-        filename = f"superwhisper_{kind}.wav"
-        path = os.path.join(tempfile.gettempdir(), filename)
-        if not os.path.exists(path):
-            freqs = (523.25, 659.25) if kind == "start" else (392.0, 293.66)
-            try:
-                self._write_chime(path, freqs)
-            except Exception as exc:
-                print(f"Failed to write sound file: {exc}")
-                return None
-        self._sound_paths[kind] = path
-        return path
-
-    def _write_chime(self, path, freqs, duration=0.14, volume=0.4):
-        sample_rate = 44100
-        frames = int(sample_rate * duration)
-        attack = 0.015
-        release = 0.04
-        with wave.open(path, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(sample_rate)
-            for i in range(frames):
-                t = i / sample_rate
-                if t < attack:
-                    env = t / attack
-                elif t > duration - release:
-                    env = max(0.0, (duration - t) / release)
-                else:
-                    env = 1.0
-                sample = 0.0
-                for freq in freqs:
-                    sample += math.sin(2 * math.pi * freq * t)
-                sample /= max(1, len(freqs))
-                sample *= volume * env
-                value = int(max(-1.0, min(1.0, sample)) * 32767)
-                wf.writeframesraw(value.to_bytes(2, byteorder="little", signed=True))
-
     def run(self):
         self.settings_window.show()
         self.settings_window.mainloop()
@@ -0,0 +1,111 @@
+import os
+import json
+import shutil
+import hashlib
+
+try:
+    from ctranslate2.converters import TransformersConverter
+    import transformers  # noqa: F401  (required by the converter)
+except ImportError:
+    TransformersConverter = None
+
+
+class ModelStore:
+    """
+    Local store of CTranslate2 Whisper models, one directory per model size
+    and quantization, each with a manifest of file sizes and SHA-256 sums.
+
+    Once a model is in the store, loading it is a plain local read: no Hub
+    lookup and, when ``transformers`` is installed, no quantization at load
+    time because the weights were converted to the requested compute type
+    when they were stored. Without ``transformers`` the pre-converted model
+    from the Hub is stored as-is and CTranslate2 quantizes it on load.
+
+    The first time a model is used in a session its checksums are verified
+    in full; later loads (e.g. after an idle unload) only compare sizes.
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root="models"):
+        self.root = os.path.abspath(root)
+        self._verified = set()
+
+    def path_for(self, model_size, quantization="default"):
+        return os.path.join(self.root, f"{model_size}-{quantization}")
+
+    def ensure(self, model_size, quantization="default"):
+        """
+        Returns the local path of the model, adding it to the store first if
+        it is missing or fails verification.
+        """
+        path = self.path_for(model_size, quantization)
+        if self.verify(path, full=path not in self._verified):
+            self._verified.add(path)
+            return path
+        if os.path.isdir(path):
+            print(f"Stored model at {path} is incomplete or modified. Fetching it again.")
+            shutil.rmtree(path)
+        self._fetch(model_size, quantization, path)
+        # The checksums are computed from the files just fetched.
+        self._write_manifest(path)
+        self._verified.add(path)
+        return path
+
+    def verify(self, path, full=False):
+        """
+        Checks the stored files against the manifest. Sizes are always
+        compared; ``full`` also recomputes the checksums.
+        """
+        try:
+            with open(os.path.join(path, self.MANIFEST), "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        for name, entry in manifest.get("files", {}).items():
+            file_path = os.path.join(path, name)
+            try:
+                if os.path.getsize(file_path) != entry["size"]:
+                    return False
+            except OSError:
+                return False
+            if full and self._checksum(file_path) != entry["sha256"]:
+                return False
+        return True
+
+    def _fetch(self, model_size, quantization, path):
+        staging = path + ".partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        if TransformersConverter is not None and quantization != "default":
+            print(f"Converting openai/whisper-{model_size} to {quantization}...")
+            converter = TransformersConverter(
+                f"openai/whisper-{model_size}",
+                copy_files=["tokenizer.json", "preprocessor_config.json"]
+            )
+            converter.convert(staging, quantization=quantization)
+        else:
+            from faster_whisper import download_model
+            print(f"Downloading model '{model_size}' to the local store...")
+            download_model(model_size, output_dir=staging)
+            # Drop the Hub's download metadata; only the model files are kept.
+            shutil.rmtree(os.path.join(staging, ".cache"), ignore_errors=True)
+        os.replace(staging, path)
+
+    def _write_manifest(self, path):
+        files = {}
+        for name in sorted(os.listdir(path)):
+            file_path = os.path.join(path, name)
+            if name == self.MANIFEST or not os.path.isfile(file_path):
+                continue
+            files[name] = {
+                "size": os.path.getsize(file_path),
+                "sha256": self._checksum(file_path)
+            }
+        with open(os.path.join(path, self.MANIFEST), "w") as f:
+            json.dump({"files": files}, f, indent=4)
+
+    def _checksum(self, file_path):
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,417 @@
+import os
+import sys
+import time
+import queue
+import collections
+import platform
+import threading
+import tkinter as tk
+import pyperclip
+from pynput import keyboard
+
+try:
+    import ctypes
+except ImportError:
+    ctypes = None
+
+try:
+    from Xlib import display as xdisplay, X
+except ImportError:
+    xdisplay = None
+
+try:
+    from AppKit import NSWorkspace
+except ImportError:
+    NSWorkspace = None
+
+_x_display = None
+
+
+def active_application():
+    """
+    Returns a lower-cased name for the application that has keyboard focus,
+    or an empty string if it can't be determined.
+
+    Windows reports the window title, X11 the window class and macOS the
+    application name.
+    """
+    global _x_display
+    try:
+        if os.name == "nt" and ctypes is not None:
+            user32 = ctypes.windll.user32
+            hwnd = user32.GetForegroundWindow()
+            length = user32.GetWindowTextLengthW(hwnd)
+            buffer = ctypes.create_unicode_buffer(length + 1)
+            user32.GetWindowTextW(hwnd, buffer, length + 1)
+            return buffer.value.lower()
+        if platform.system() == "Darwin" and NSWorkspace is not None:
+            app = NSWorkspace.sharedWorkspace().frontmostApplication()
+            return (app.localizedName() or "").lower()
+        if xdisplay is not None and os.environ.get("DISPLAY"):
+            if _x_display is None:
+                _x_display = xdisplay.Display()
+            root = _x_display.screen().root
+            active = root.get_full_property(
+                _x_display.intern_atom("_NET_ACTIVE_WINDOW"), X.AnyPropertyType
+            )
+            if not active or not active.value:
+                return ""
+            window = _x_display.create_resource_object("window", active.value[0])
+            wm_class = window.get_wm_class() or ()
+            return " ".join(wm_class).lower()
+    except Exception as exc:
+        print(f"Could not determine the active application: {exc}")
+    return ""
+
+
+class ClipboardPaster:
+    """
+    Pastes text into the focused window through the clipboard and then puts
+    the previous clipboard contents back.
+
+    The keyboard controller is created once, and the clipboard is accessed
+    through the Tk connection the app already holds instead of pyperclip,
+    which spawns xclip/xsel on Linux for every call. On X11 the text is
+    served through a selection handler, so once ``min_restore_delay_ms`` has
+    passed the previous contents are restored as soon as the paste has been
+    read. The delay matters because clipboard managers read the selection as
+    soon as its owner changes, before the target has handled the keystroke.
+
+    On Windows and macOS there is no such confirmation: the clipboard is
+    restored a fixed ``blind_restore_delay_ms`` after the keystroke, so a
+    target that handles the paste later than that pastes the old contents.
+
+    Pastes requested while another one is still in flight are queued, so the
+    clipboard is never replaced before the target has read it.
+    """
+    def __init__(self, root=None, restore_delay_ms=50, restore_timeout_ms=500,
+                 min_restore_delay_ms=150, blind_restore_delay_ms=100):
+        """
+        Args:
+            root (tk.Tk, optional): The app's Tk root. Without it the clipboard is
+                accessed through pyperclip.
+            restore_delay_ms (int): Delay before restoring the clipboard once the paste
+                has been read (X11).
+            restore_timeout_ms (int): Upper bound on how long to wait for the target
+                application to read the paste on X11.
+            min_restore_delay_ms (int): Minimum time after the paste keystroke before the
+                clipboard is restored on X11, however early the paste was read.
+            blind_restore_delay_ms (int): Delay between the paste keystroke and restoring
+                the clipboard where the read can't be observed (Windows, macOS).
+        """
+        self.root = root
+        self.restore_delay_ms = restore_delay_ms
+        self.restore_timeout_ms = restore_timeout_ms
+        self.min_restore_delay_ms = min_restore_delay_ms
+        self.blind_restore_delay_ms = blind_restore_delay_ms
+        self.controller = keyboard.Controller()
+        self.paste_key = keyboard.Key.ctrl
+        if platform.system() == "Darwin":
+            self.paste_key = keyboard.Key.cmd
+        self._pending = None
+        self._backlog = []
+        self._x11 = False
+        if self.root is not None:
+            self._x11 = self.root.tk.call("tk", "windowingsystem") == "x11"
+        if self._x11:
+            for target in ("UTF8_STRING", "STRING"):
+                self.root.selection_handle(
+                    self._serve_selection, selection="CLIPBOARD", type=target
+                )
+
+    def write(self, text):
+        self.paste(text)
+
+    def busy(self):
+        """
+        True while a paste is in flight, i.e. until the clipboard is restored.
+        """
+        return self._pending is not None or bool(self._backlog)
+
+    def copy(self, text):
+        if self.root is None:
+            pyperclip.copy(text)
+            return
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+
+    def read(self):
+        if self.root is None:
+            try:
+                return pyperclip.paste()
+            except pyperclip.PyperclipException:
+                return ""
+        try:
+            return self.root.clipboard_get()
+        except tk.TclError:
+            return ""
+
+    def paste(self, text):
+        if self._pending is not None:
+            self._backlog.append(text)
+            return
+        self._paste(text, self.read())
+
+    def _paste(self, text, original):
+        self._pending = {"text": text, "original": original, "timer": None, "sent": None, "read": False}
+
+        if self._x11:
+            self.root.selection_own(selection="CLIPBOARD")
+        else:
+            self.copy(text)
+
+        with self.controller.pressed(self.paste_key):
+            self.controller.press("v")
+            self.controller.release("v")
+        self._pending["sent"] = time.monotonic()
+
+        delay = self.restore_timeout_ms if self._x11 else self.blind_restore_delay_ms
+        self._schedule_restore(delay)
+
+    def _serve_selection(self, offset, length):
+        pending = self._pending
+        if pending is None:
+            return ""
+        offset = int(offset)
+        length = int(length)
+        text = pending["text"]
+        if offset + length >= len(text) and not pending["read"]:
+            # The whole paste has been read, by the target or by a clipboard
+            # manager. Restore shortly after, but never before the minimum delay.
+            pending["read"] = True
+            elapsed_ms = (time.monotonic() - pending["sent"]) * 1000
+            self._cancel(pending)
+            self._schedule_restore(
+                int(max(self.restore_delay_ms, self.min_restore_delay_ms - elapsed_ms))
+            )
+        return text[offset:offset + length]
+
+    def _schedule_restore(self, delay_ms):
+        if self.root is not None:
+            self._pending["timer"] = self.root.after(delay_ms, self._restore)
+        else:
+            timer = threading.Timer(delay_ms / 1000.0, self._restore)
+            timer.daemon = True
+            timer.start()
+            self._pending["timer"] = timer
+
+    def _cancel(self, pending):
+        timer = pending["timer"]
+        if timer is None:
+            return
+        if self.root is not None:
+            self.root.after_cancel(timer)
+        else:
+            timer.cancel()
+        pending["timer"] = None
+
+    def _restore(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        if self._backlog:
+            # Keep the user's original contents until the last queued paste.
+            self._paste(self._backlog.pop(0), pending["original"])
+            return
+        # Leave the clipboard alone if something else was copied meanwhile.
+        if self._x11:
+            try:
+                owner = self.root.selection_own_get(selection="CLIPBOARD")
+            except tk.TclError:
+                owner = None
+            # A clipboard manager that took over the selection holds a copy of
+            # the pasted text; that still gets replaced by the original.
+            if owner is not self.root and self.read() != pending["text"]:
+                return
+        elif self.read() != pending["text"]:
+            return
+        self.copy(pending["original"])
+
+
+class KeyboardTyper:
+    """
+    Types text into the focused window with simulated key presses, leaving
+    the clipboard untouched.
+
+    Text is typed on a background thread in chunks of ``chunk_size``
+    characters. ``chars_per_second`` limits the typing rate for applications
+    that drop fast input; 0 types as fast as the OS accepts.
+    """
+    def __init__(self, chunk_size=32, chars_per_second=0):
+        self.chunk_size = chunk_size
+        self.chars_per_second = chars_per_second
+        self.controller = keyboard.Controller()
+        self._texts = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, text):
+        self._texts.put(text)
+
+    def busy(self):
+        """
+        True until every queued text has been typed.
+        """
+        return self._texts.unfinished_tasks > 0
+
+    def _run(self):
+        while True:
+            text = self._texts.get()
+            try:
+                self._type(text)
+            finally:
+                self._texts.task_done()
+
+    def _type(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            chunk = text[start:start + self.chunk_size]
+            began = time.monotonic()
+            try:
+                self.controller.type(chunk)
+            except Exception as exc:
+                print(f"Typing failed: {exc}")
+                return
+            if self.chars_per_second:
+                remaining = len(chunk) / self.chars_per_second - (time.monotonic() - began)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+
+class StreamWriter:
+    """
+    Writes each transcription as a line to stdout, or appends it to a file,
+    for headless use.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._file = None
+        if path:
+            self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, text):
+        stream = self._file or sys.stdout
+        stream.write(text + "\n")
+        stream.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class OutputRouter:
+    """
+    Sends transcriptions to one of the output backends.
+
+    The backend is ``output_backend`` from the settings unless one of the
+    ``output_rules`` matches the focused application. Rules map a
+    case-insensitive substring of the application name to a backend name.
+    The ``auto`` backend types short texts and pastes longer ones.
+
+    Outputs go through one queue in order. A text is only handed to its
+    backend once the previous one has finished, so a paste never lands in
+    the middle of typed text and its Ctrl/Cmd key is never held while
+    characters are still being typed.
+    """
+    def __init__(self, root=None, poll_ms=10):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._outputs = collections.deque()
+        self._poll = None
+        self.clipboard = ClipboardPaster(root)
+        self.backends = {
+            "clipboard": self.clipboard,
+            "type": KeyboardTyper(),
+            "stdout": StreamWriter()
+        }
+        self.default = "clipboard"
+        self.rules = {}
+        self.type_max_chars = 40
+        self._warned_unknown_application = False
+
+    def configure(self, settings):
+        self.default = settings.get("output_backend", "clipboard")
+        self.rules = {
+            pattern.lower(): backend
+            for pattern, backend in (settings.get("output_rules") or {}).items()
+        }
+        self.type_max_chars = settings.get("type_max_chars", 40)
+        self.backends["type"].chars_per_second = settings.get("type_chars_per_second", 0)
+
+        path = settings.get("output_file")
+        current = self.backends.get("file")
+        if current is not None and current.path != path:
+            current.close()
+            del self.backends["file"]
+        if path and "file" not in self.backends:
+            try:
+                self.backends["file"] = StreamWriter(path)
+            except OSError as exc:
+                print(f"Failed to open output file '{path}': {exc}")
+
+    def backend_name(self, text):
+        name = self.default
+        if self.rules:
+            application = active_application()
+            if not application and not self._warned_unknown_application:
+                self._warned_unknown_application = True
+                print(
+                    "output_rules are set but the focused application can't be determined; "
+                    "the rules are ignored. On Linux this needs python-xlib and an X11 "
+                    "session, on macOS pyobjc-framework-Cocoa."
+                )
+            for pattern, backend in self.rules.items():
+                if pattern in application:
+                    name = backend
+                    break
+        if name == "auto":
+            name = "type" if len(text) <= self.type_max_chars else "clipboard"
+        return name
+
+    def write(self, text, backend_name=None):
+        """
+        Outputs the text and returns the name of the backend that was used.
+        ``backend_name`` overrides the automatic choice, e.g. to keep the
+        pieces of one progressive dictation on the same backend.
+        """
+        name = backend_name or self.backend_name(text)
+        backend = self.backends.get(name)
+        if backend is None:
+            print(f"Unknown output backend '{name}'. Using the clipboard.")
+            name, backend = "clipboard", self.clipboard
+        self._outputs.append((backend, text))
+        if self._poll is None:
+            self._drain()
+        return name
+
+    def when_idle(self, callback):
+        """
+        Calls ``callback`` once every output queued so far has been delivered
+        (typed, or pasted and the clipboard restored).
+        """
+        self._outputs.append((None, callback))
+        if self._poll is None:
+            self._drain()
+
+    def _busy(self):
+        return any(
+            backend.busy() for backend in self.backends.values() if hasattr(backend, "busy")
+        )
+
+    def _drain(self):
+        self._poll = None
+        while self._outputs:
+            if self._busy():
+                if self.root is None:
+                    time.sleep(self.poll_ms / 1000.0)
+                    continue
+                # Check again shortly; the typer finishes on its own thread
+                # and the paster once the clipboard is restored.
+                if self._poll is None:
+                    self._poll = self.root.after(self.poll_ms, self._drain)
+                return
+            backend, text = self._outputs.popleft()
+            if backend is None:
+                text()
+            else:
+                backend.write(text)
@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter, deque
+
+
+class SamplingProfiler:
+    """
+    In-process sampling profiler for individual dictations.
+
+    Once armed for a number of dictations, every dictation between ``begin``
+    and ``end`` is profiled: a background thread snapshots the stacks of all
+    threads every ``interval_ms`` and, when the dictation ends, writes them
+    as collapsed stacks (``thread;outer;...;inner count``) to a ``.folded``
+    file that flamegraph.pl, speedscope or inferno can render directly.
+
+    Only stacks that pass through one of the ``focus`` functions are kept,
+    so idle threads don't drown out the dictation. Dictations must end in
+    the order they began, which is how the worker delivers them.
+    """
+    def __init__(self, focus=(), interval_ms=5, output_dir="profiles"):
+        self.focus = {getattr(func, "__code__", func) for func in focus}
+        self.interval_ms = interval_ms
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._dictations = deque()
+        self._thread = None
+        self._sequence = 0
+
+    def arm(self, dictations):
+        """
+        Profiles the next ``dictations`` dictations.
+        """
+        with self._lock:
+            self._remaining = dictations
+        print(f"Profiling the next {dictations} dictation(s).")
+
+    def begin(self):
+        with self._lock:
+            if not self._remaining:
+                self._dictations.append(None)
+                return
+            self._remaining -= 1
+            self._dictations.append(Counter())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def cancel(self):
+        """
+        Drops the dictation that began last without writing it, e.g. when
+        nothing was recorded. It doesn't count towards the armed dictations.
+        """
+        with self._lock:
+            if self._dictations and self._dictations.pop() is not None:
+                self._remaining += 1
+
+    def end(self):
+        with self._lock:
+            if not self._dictations:
+                return
+            stacks = self._dictations.popleft()
+            self._sequence += 1
+            sequence = self._sequence
+        if stacks is not None:
+            self._write(stacks, sequence)
+
+    def _active(self):
+        return [stacks for stacks in self._dictations if stacks is not None]
+
+    def _run(self):
+        interval = self.interval_ms / 1000.0
+        while True:
+            samples = self._sample()
+            with self._lock:
+                active = self._active()
+                if not active:
+                    self._thread = None
+                    return
+                for stacks in active:
+                    stacks.update(samples)
+            time.sleep(interval)
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        samples = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            labels = []
+            focused = not self.focus
+            while frame is not None:
+                code = frame.f_code
+                focused = focused or code in self.focus
+                labels.append(self._label(code))
+                frame = frame.f_back
+            if focused:
+                labels.append(names.get(ident, str(ident)).replace(" ", "_"))
+                samples.append(";".join(reversed(labels)))
+        return samples
+
+    def _label(self, code):
+        name = getattr(code, "co_qualname", code.co_name)
+        return f"{os.path.basename(code.co_filename)}:{name}"
+
+    def _write(self, stacks, sequence):
+        if not stacks:
+            print("Profiled dictation finished too quickly to be sampled.")
+            return
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(
+                self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{sequence}.folded"
+            )
+            with open(path, "w") as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+        except OSError as exc:
+            print(f"Failed to write profile: {exc}")
+            return
+        print(f"Wrote profile ({sum(stacks.values())} samples) to {path}")
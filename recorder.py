@@ -3,81 +3,464 @@ import webrtcvad
 import collections
 import pyaudio
 import threading
+import queue
+import numpy as np
 
-class AudioRecorder:
-    def __init__(self, channels=1, rate=16000, chunk=1024, frame_duration_ms=30):
+
+def find_speech_regions(speech_flags, frame_duration_ms, padding_ms=300,
+                        on_ratio=0.75, off_ratio=0.9, min_voiced_ms=90):
+    """
+    Groups per-frame VAD decisions into padded speech regions.
+
+    A sliding window of ``padding_ms`` smooths the decisions: a region opens
+    once ``on_ratio`` of the window is voiced and closes once ``off_ratio``
+    of it is unvoiced, so single-frame clicks and dips don't toggle it.
+    Roughly one window of audio is kept as padding at either edge.
+
+    Words too short to fill ``on_ratio`` of the window (a quick "yes") would
+    never open a region, so until the window has filled the ratio applies to
+    the frames seen so far, and a recording without any region falls back to
+    its most voiced window if that has at least ``min_voiced_ms`` of speech.
+
+    Returns:
+        list: ``(start_frame, end_frame)`` index pairs, end exclusive.
+    """
+    window = max(1, int(padding_ms // frame_duration_ms))
+    min_voiced = max(1, int(min_voiced_ms // frame_duration_ms))
+    ring = collections.deque(maxlen=window)
+    regions = []
+    start = None
+    best_voiced, best_index = 0, None
+    for index, is_speech in enumerate(speech_flags):
+        ring.append(is_speech)
+        voiced = sum(ring)
+        if start is None:
+            if voiced >= min_voiced and voiced >= on_ratio * len(ring):
+                previous_end = regions[-1][1] if regions else 0
+                start = max(previous_end, index + 1 - voiced - window)
+                ring.clear()
+            elif voiced > best_voiced:
+                best_voiced, best_index = voiced, index
+        elif len(ring) - voiced >= off_ratio * window:
+            regions.append((start, index + 1))
+            start = None
+    if start is not None:
+        regions.append((start, len(speech_flags)))
+    if not regions and best_voiced >= min_voiced:
+        regions.append((
+            max(0, best_index + 1 - 2 * window),
+            min(len(speech_flags), best_index + 1 + window)
+        ))
+    return regions
+
+
+class UtteranceSegmenter:
+    """
+    Splits a stream of VAD-classified frames into utterances.
+
+    An utterance starts on the first voiced frame (plus ``padding_ms`` of
+    pre-roll) and ends once ``hangover_ms`` of continuous silence has been
+    seen, or when it reaches ``max_utterance_ms``. Utterances with less than
+    ``min_utterance_ms`` of voiced audio are dropped as noise.
+    """
+    def __init__(self, frame_duration_ms, hangover_ms=600, min_utterance_ms=300,
+                 max_utterance_ms=15000, padding_ms=300):
+        self.frame_duration_ms = frame_duration_ms
+        self.hangover_frames = max(1, int(hangover_ms // frame_duration_ms))
+        self.min_voiced_frames = max(1, int(min_utterance_ms // frame_duration_ms))
+        self.max_frames = max(1, int(max_utterance_ms // frame_duration_ms))
+        self.padding_frames = int(padding_ms // frame_duration_ms)
+        self._preroll = collections.deque(maxlen=max(1, self.padding_frames))
+        self._frames = []
+        self._voiced = 0
+        self._silence = 0
+        self.triggered = False
+
+    def push(self, frame, is_speech):
+        """
+        Feeds one frame. Returns the PCM of a finished utterance, or None.
+        """
+        if not self.triggered:
+            self._preroll.append(frame)
+            if is_speech:
+                self.triggered = True
+                self._frames = list(self._preroll)
+                self._preroll.clear()
+                self._voiced = 1
+                self._silence = 0
+            return None
+
+        self._frames.append(frame)
+        if is_speech:
+            self._voiced += 1
+            self._silence = 0
+        else:
+            self._silence += 1
+
+        if self._silence >= self.hangover_frames or len(self._frames) >= self.max_frames:
+            return self._finish()
+        return None
+
+    def flush(self):
+        """
+        Ends the current utterance, if any, and returns its PCM.
+        """
+        if not self.triggered:
+            return None
+        return self._finish()
+
+    def _finish(self):
+        frames = self._frames
+        # Keep only as much trailing silence as the leading padding.
+        trailing = max(0, self._silence - self.padding_frames)
+        if trailing:
+            frames = frames[:-trailing]
+        voiced = self._voiced
+        self._frames = []
+        self._voiced = 0
+        self._silence = 0
+        self.triggered = False
+        if voiced < self.min_voiced_frames:
+            return None
+        return b''.join(frames)
+
+
+def pcm_to_float(pcm_data):
+    """
+    Converts 16-bit PCM to the float32 samples in [-1, 1] the model expects.
+    """
+    return np.frombuffer(pcm_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class StreamResampler:
+    """
+    Converts interleaved 16-bit chunks captured at the device's native rate
+    and channel count into 16-bit mono PCM at ``out_rate``.
+
+    Filter history and interpolation phase are carried across chunks, so the
+    stream can be converted piece by piece as it arrives.
+    """
+    def __init__(self, in_rate, channels, out_rate=16000, taps=31):
+        self.in_rate = in_rate
         self.channels = channels
+        self.out_rate = out_rate
+        self.step = in_rate / float(out_rate)
+        self._filter = None
+        if in_rate > out_rate:
+            # Windowed-sinc low-pass just below the output Nyquist frequency.
+            cutoff = 0.45 * out_rate / in_rate
+            n = np.arange(taps) - (taps - 1) / 2.0
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self._filter = (kernel / kernel.sum()).astype(np.float32)
+            self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._position = 0.0
+
+    def process(self, data):
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        if self.channels > 1:
+            usable = len(samples) - len(samples) % self.channels
+            samples = samples[:usable].reshape(-1, self.channels).mean(axis=1)
+        if self.in_rate != self.out_rate:
+            samples = self._resample(samples)
+        return np.clip(np.rint(samples), -32768, 32767).astype(np.int16).tobytes()
+
+    def _resample(self, samples):
+        if self._filter is not None:
+            padded = np.concatenate((self._history, samples))
+            self._history = padded[len(padded) - len(self._history):]
+            samples = np.convolve(padded, self._filter, mode="valid")
+
+        # Linear interpolation; the last input sample is kept so the next
+        # chunk can interpolate across the boundary.
+        buffer = np.concatenate((self._carry, samples))
+        if len(buffer) < 2:
+            self._carry = buffer
+            return np.zeros(0, dtype=np.float32)
+        positions = np.arange(self._position, len(buffer) - 1, self.step)
+        output = np.interp(positions, np.arange(len(buffer)), buffer)
+        next_position = positions[-1] + self.step if len(positions) else self._position
+        self._position = next_position - (len(buffer) - 1)
+        self._carry = buffer[-1:]
+        return output
+
+
+class AudioRecorder:
+    def __init__(self, rate=16000, chunk=1024, frame_duration_ms=30, device_index=None):
+        # ``rate`` and ``channels`` describe the PCM handed to the VAD and the
+        # model; the device itself is opened at its native format.
+        self.channels = 1
         self.rate = rate
         self.chunk = chunk
         self.format = pyaudio.paInt16
         self.frame_duration_ms = frame_duration_ms
         self.frame_size = int(self.rate * (self.frame_duration_ms / 1000.0))
+        self.max_pause_ms = 300
+        self.device_index = device_index
         self.frames = []
+        # VAD decision for each frame of ``frames``, made while recording.
+        self.speech_flags = []
+        self.speech_regions = []
         self.recording = False
+        self.listening = False
         self.stream = None
         self.p = pyaudio.PyAudio()
         self.vad = webrtcvad.Vad(3)  # Aggressiveness mode from 0 to 3
         self.lock = threading.Lock()
+        self._audio_queue = queue.Queue()
+        self._consumer = None
+        self._resampler = None
+        self._segmenter = None
+        self._on_utterance = None
+        # Called from the consumer thread with the RMS level (0..1) of each
+        # captured chunk and whether its last frame was voiced.
+        self.on_level = None
+
+    def list_input_devices(self):
+        """
+        Lists the available capture devices.
+
+        Returns:
+            list: Dicts with the device ``index``, ``name``, native ``rate``
+            and input ``channels``.
+        """
+        devices = []
+        for index in range(self.p.get_device_count()):
+            info = self.p.get_device_info_by_index(index)
+            if info.get("maxInputChannels", 0) > 0:
+                devices.append({
+                    "index": index,
+                    "name": info.get("name"),
+                    "rate": int(info.get("defaultSampleRate", self.rate)),
+                    "channels": int(info.get("maxInputChannels"))
+                })
+        return devices
+
+    def set_input_device(self, name):
+        """
+        Selects the capture device by name. None or an unknown name selects
+        the system default. Takes effect on the next recording.
+        """
+        self.device_index = None
+        if not name:
+            return
+        for device in self.list_input_devices():
+            if device["name"] == name:
+                self.device_index = device["index"]
+                return
+        print(f"Input device '{name}' not found. Using the default device.")
+
+    def _open_stream(self):
+        if self.device_index is None:
+            info = self.p.get_default_input_device_info()
+        else:
+            info = self.p.get_device_info_by_index(self.device_index)
+        capture_rate = int(info.get("defaultSampleRate", self.rate))
+        capture_channels = max(1, min(2, int(info.get("maxInputChannels", 1))))
+        self._resampler = StreamResampler(capture_rate, capture_channels, self.rate)
+        self._audio_queue = queue.Queue()
+        return self.p.open(
+            format=self.format,
+            channels=capture_channels,
+            rate=capture_rate,
+            input=True,
+            input_device_index=info.get("index"),
+            frames_per_buffer=int(self.chunk * capture_rate / self.rate),
+            stream_callback=self._callback
+        )
+
+    def _start_consumer(self):
+        self._consumer = threading.Thread(target=self._consume_loop, daemon=True)
+        self._consumer.start()
+
+    def _stop_stream(self):
+        # The callback never takes the lock, so the stream can be stopped
+        # without holding it. The consumer then drains what was captured.
+        self.stream.stop_stream()
+        self.stream.close()
+        self._audio_queue.put(None)
+        self._consumer.join()
+        self._consumer = None
 
     def start_recording(self):
+        """
+        Starts push-to-talk capture.
+
+        Returns:
+            bool: True if the input stream was opened.
+        """
         with self.lock:
-            if self.recording:
-                return
+            if self.recording or self.listening:
+                return self.recording
             self.frames = []
+            self.speech_flags = []
+            self._segmenter = None
             try:
-                self.stream = self.p.open(
-                    format=self.format,
-                    channels=self.channels,
-                    rate=self.rate,
-                    input=True,
-                    frames_per_buffer=self.chunk,
-                    stream_callback=self._callback
-                )
+                self.stream = self._open_stream()
             except Exception as exc:
                 print(f"Failed to start recording: {exc}")
                 self.recording = False
-                return
+                return False
             self.recording = True
+            self._start_consumer()
             self.stream.start_stream()
+            return True
 
-    def _callback(self, in_data, frame_count, time_info, status):
+    def start_listening(self, on_utterance, hangover_ms=600, min_utterance_ms=300,
+                        max_utterance_ms=15000):
+        """
+        Starts hands-free capture. The live stream is split into utterances by
+        the VAD and each finished utterance is passed to ``on_utterance`` as
+        raw 16-bit mono PCM, from the recorder's consumer thread.
+
+        Returns:
+            bool: True if the input stream was opened.
+        """
         with self.lock:
-            if self.recording:
-                self.frames.append(in_data)
-            return (in_data, pyaudio.paContinue)
+            if self.recording or self.listening:
+                return self.listening
+            self._segmenter = UtteranceSegmenter(
+                self.frame_duration_ms,
+                hangover_ms=hangover_ms,
+                min_utterance_ms=min_utterance_ms,
+                max_utterance_ms=max_utterance_ms
+            )
+            self._on_utterance = on_utterance
+            try:
+                self.stream = self._open_stream()
+            except Exception as exc:
+                print(f"Failed to start listening: {exc}")
+                return False
+            self.listening = True
+            self._start_consumer()
+            self.stream.start_stream()
+            return True
+
+    def stop_listening(self):
+        with self.lock:
+            if not self.listening:
+                return
+            self.listening = False
+        self._stop_stream()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self._audio_queue.put(in_data)
+        return (None, pyaudio.paContinue)
+
+    def _consume_loop(self):
+        frame_bytes = self.frame_size * 2
+        buffer = bytearray()
+        is_speech = False
+        while True:
+            data = self._audio_queue.get()
+            if data is None:
+                break
+            pcm = self._resampler.process(data)
+            if self._segmenter is None:
+                self.frames.append(pcm)
+            buffer.extend(pcm)
+            offset = 0
+            while offset + frame_bytes <= len(buffer):
+                frame = bytes(buffer[offset:offset + frame_bytes])
+                offset += frame_bytes
+                is_speech = self.vad.is_speech(frame, self.rate)
+                if self._segmenter is not None:
+                    self._emit_utterance(self._segmenter.push(frame, is_speech))
+                else:
+                    self.speech_flags.append(is_speech)
+            del buffer[:offset]
+            if self.on_level is not None and pcm:
+                self.on_level(self._rms(pcm), is_speech)
+        if self._segmenter is not None:
+            self._emit_utterance(self._segmenter.flush())
+
+    def _rms(self, pcm_data):
+        samples = np.frombuffer(pcm_data, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) / 32768.0
+
+    def _emit_utterance(self, pcm_data):
+        if not pcm_data:
+            return
+        try:
+            self._on_utterance(pcm_data)
+        except Exception as exc:
+            print(f"Error handling utterance: {exc}")
 
     def stop_recording(self, output_filename="output.wav"):
+        pcm_data = self.stop_recording_pcm()
+        if not pcm_data:
+            return None
+
+        # Save the processed audio
+        return self.write_wav(output_filename, pcm_data)
+
+    def stop_recording_pcm(self):
+        """
+        Stops recording and returns the speech as 16-bit mono PCM, with the
+        pauses between speech regions shortened, or None if no speech was
+        detected.
+        """
         with self.lock:
             if not self.recording:
                 return None
-                
             self.recording = False
-            self.stream.stop_stream()
-            self.stream.close()
+        self._stop_stream()
+
+        # Voice Activity Detection (VAD)
+        pcm_data = b''.join(self.frames)
 
-            # Voice Activity Detection (VAD)
-            pcm_data = b''.join(self.frames)
-            
         if not pcm_data:
             return None
 
-        # VAD processing on raw 16-bit mono PCM
-        frames = self.frame_generator(self.frame_duration_ms, pcm_data, self.rate)
-        voiced_frames = []
-        for frame in frames:
-            is_speech = self.vad.is_speech(frame.bytes, self.rate)
-            if is_speech:
-                voiced_frames.append(frame)
+        # The consumer already ran the VAD on every frame while recording.
+        frames = list(self.frame_generator(self.frame_duration_ms, pcm_data, self.rate))
+        flags = self.speech_flags[:len(frames)]
+        regions = find_speech_regions(flags, self.frame_duration_ms)
+        self.speech_regions = []
 
-        if not voiced_frames:
+        if not regions:
             return None
 
-        # Save the processed audio
+        pcm_data, self.speech_regions = self._compress_pauses(frames, regions)
+        return pcm_data
+
+    def _compress_pauses(self, frames, regions):
+        """
+        Joins speech regions, shortening the pauses between them to at most
+        ``max_pause_ms`` instead of removing them, so word boundaries survive.
+
+        Returns:
+            tuple: The PCM data and the ``(start, end)`` times in seconds of
+            each region within it.
+        """
+        max_gap = max(0, int(self.max_pause_ms // self.frame_duration_ms))
+        head = max_gap // 2
+        frame_seconds = self.frame_duration_ms / 1000.0
+        kept = []
+        timestamps = []
+        previous_end = None
+        for start, end in regions:
+            if previous_end is not None:
+                if start - previous_end > max_gap:
+                    kept.extend(frames[previous_end:previous_end + head])
+                    kept.extend(frames[start - (max_gap - head):start])
+                else:
+                    kept.extend(frames[previous_end:start])
+            region_start = len(kept) * frame_seconds
+            kept.extend(frames[start:end])
+            timestamps.append((round(region_start, 3), round(len(kept) * frame_seconds, 3)))
+            previous_end = end
+        return b''.join(frame.bytes for frame in kept), timestamps
+
+    def write_wav(self, output_filename, pcm_data):
+        """
+        Writes raw PCM captured by this recorder to a WAV file.
+        """
         with wave.open(output_filename, 'wb') as wf:
             wf.setnchannels(self.channels)
             wf.setsampwidth(self.p.get_sample_size(self.format))
             wf.setframerate(self.rate)
-            wf.writeframes(b''.join(f.bytes for f in voiced_frames))
+            wf.writeframes(pcm_data)
             
         return output_filename
 
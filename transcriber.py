@@ -1,8 +1,36 @@
 from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.transcribe import get_compression_ratio
+import gc
+import numpy as np
 import torch
 
+
+def merge_clips(regions, max_seconds=30.0):
+    """
+    Merges neighbouring ``(start, end)`` speech regions into clips of at most
+    ``max_seconds``. faster-whisper runs a separate encoder and decoder pass
+    for every clip, so passing each region on its own would cost one pass
+    per pause.
+    """
+    clips = []
+    for start, end in regions:
+        if clips and end - clips[-1][0] <= max_seconds:
+            clips[-1] = (clips[-1][0], end)
+        else:
+            clips.append((start, end))
+    return clips
+
+
 class Transcriber:
-    def __init__(self, model_size="base", device="auto", compute_type="default"):
+    # faster-whisper's defaults, applied to batched clips the way
+    # ``WhisperModel.transcribe`` applies them to single ones.
+    NO_SPEECH_THRESHOLD = 0.6
+    LOG_PROB_THRESHOLD = -1.0
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+
+    def __init__(self, model_size="base", device="auto", compute_type="default", model_store=None):
         """
         Initializes the Transcriber with a Whisper model.
 
@@ -10,6 +38,8 @@ class Transcriber:
             model_size (str): The size of the Whisper model to use (e.g., "tiny", "base", "small").
             device (str): The device to run the model on ("auto", "cpu", "cuda").
             compute_type (str): The compute type for the model ("default", "int8", "float16").
+            model_store (ModelStore, optional): Local store to load the model from. Without it
+                the model is resolved through the Hugging Face cache.
         """
         if device == "auto":
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -22,32 +52,167 @@ class Transcriber:
             self.compute_type = compute_type
 
         self.model_size = model_size
-        self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+        self.model_store = model_store
+        self.model = None
+        self.load()
 
-    def transcribe(self, audio_path, language=None):
+    def load(self):
+        """
+        Loads the model if it is not loaded. Called automatically before
+        transcribing, so an unloaded model is reloaded on demand.
         """
-        Transcribes an audio file.
+        if self.model is not None:
+            return
+        model_path = self.model_size
+        if self.model_store is not None:
+            model_path = self.model_store.ensure(self.model_size, self.compute_type)
+        self.model = WhisperModel(model_path, device=self.device, compute_type=self.compute_type)
+
+    def unload(self):
+        """
+        Releases the model's memory until the next ``load``.
+        """
+        if self.model is None:
+            return
+        self.model = None
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def transcribe(self, audio, language=None, clip_timestamps=None):
+        """
+        Transcribes an audio file or buffer.
 
         Args:
-            audio_path (str): The path to the audio file to transcribe.
+            audio (str or np.ndarray): The path to the audio file to transcribe, or
+                16 kHz mono float32 samples.
             language (str, optional): The language of the audio. If None, it will be auto-detected.
+            clip_timestamps (list, optional): ``(start, end)`` pairs in seconds of the speech
+                regions in the file. Only these regions are decoded; neighbouring regions
+                are merged into clips of up to 30 seconds.
 
         Returns:
             str: The transcribed text.
         """
-        segments, info = self.model.transcribe(audio_path, beam_size=5, language=language)
+        transcription = "".join(self.transcribe_stream(audio, language, clip_timestamps))
+        return transcription.strip()
+
+    def transcribe_stream(self, audio, language=None, clip_timestamps=None):
+        """
+        Transcribes an audio file or buffer, yielding the text of each segment as soon as
+        it is decoded. Takes the same arguments as ``transcribe``.
+
+        Yields:
+            str: The text of each segment, including its leading space.
+        """
+        self.load()
+        options = {}
+        if clip_timestamps:
+            options["clip_timestamps"] = [
+                t for clip in merge_clips(clip_timestamps) for t in clip
+            ]
+        segments, info = self.model.transcribe(audio, beam_size=5, language=language, **options)
 
         print(f"Detected language '{info.language}' with probability {info.language_probability}")
 
-        transcription = "".join(segment.text for segment in segments)
-        return transcription.strip()
+        for segment in segments:
+            yield segment.text
+
+    def transcribe_batch(self, audios, language=None, beam_size=5):
+        """
+        Transcribes several short clips with one batched encoder and decoder
+        pass instead of one pass per clip.
+
+        Clips longer than Whisper's 30 second window are transcribed
+        individually with ``transcribe``. As in ``transcribe``, clips that are
+        probably silence come back empty, and clips whose greedy result looks
+        unreliable (low log probability or repetitive text) are transcribed
+        again with ``transcribe`` so they get its temperature fallback.
+
+        Args:
+            audios (list): Audio file paths or 16 kHz mono float32 sample arrays.
+            language (str, optional): The language of the audio. If None, it is detected per clip.
+            beam_size (int): The beam size used for decoding.
+
+        Returns:
+            list: The transcribed text of each clip, in the same order.
+        """
+        self.load()
+        extractor = self.model.feature_extractor
+        results = [None] * len(audios)
+        batch = []
+        features = []
+        clips = []
+        for index, audio in enumerate(audios):
+            if isinstance(audio, str):
+                audio = decode_audio(audio, sampling_rate=extractor.sampling_rate)
+            clips.append(audio)
+            if len(audio) > extractor.n_samples:
+                results[index] = self.transcribe(audio, language)
+                continue
+            mel = extractor(audio)[:, :extractor.nb_max_frames]
+            padding = extractor.nb_max_frames - mel.shape[-1]
+            features.append(np.pad(mel, ((0, 0), (0, padding))))
+            batch.append(index)
+
+        if not batch:
+            return results
+
+        encoder_output = self.model.encode(np.stack(features).astype(np.float32))
+        if language or not self.model.model.is_multilingual:
+            languages = [language or "en"] * len(batch)
+        else:
+            detected = self.model.model.detect_language(encoder_output)
+            languages = [probabilities[0][0][2:-2] for probabilities in detected]
+
+        tokenizers = {}
+        prompts = []
+        for clip_language in languages:
+            if clip_language not in tokenizers:
+                tokenizers[clip_language] = Tokenizer(
+                    self.model.hf_tokenizer,
+                    self.model.model.is_multilingual,
+                    task="transcribe",
+                    language=clip_language
+                )
+            tokenizer = tokenizers[clip_language]
+            prompts.append(list(tokenizer.sot_sequence) + [tokenizer.no_timestamps])
+
+        outputs = self.model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=beam_size,
+            max_length=self.model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            return_scores=True,
+            return_no_speech_prob=True
+        )
+        for index, clip_language, output in zip(batch, languages, outputs):
+            tokens = output.sequences_ids[0]
+            text = tokenizers[clip_language].decode(tokens).strip()
+            avg_logprob = output.scores[0] * len(tokens) / (len(tokens) + 1)
+            if (
+                output.no_speech_prob > self.NO_SPEECH_THRESHOLD
+                and avg_logprob <= self.LOG_PROB_THRESHOLD
+            ):
+                results[index] = ""
+            elif (
+                avg_logprob < self.LOG_PROB_THRESHOLD
+                or get_compression_ratio(text) > self.COMPRESSION_RATIO_THRESHOLD
+            ):
+                results[index] = self.transcribe(clips[index], language)
+            else:
+                results[index] = text
+        return results
 
     def change_model(self, model_size):
         """
         Changes the loaded Whisper model.
         """
+        self.unload()
         self.model_size = model_size
-        self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+        self.load()
 
 
 if __name__ == '__main__':
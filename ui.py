@@ -1,9 +1,77 @@
 import os
+import math
+import time
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
 
+class UIEventBus:
+    """
+    Delivers events posted from any thread to handlers on the Tk thread.
+
+    Threads only append to a queue; the Tk loop drains it every ``tick_ms``.
+    Events posted with ``coalesce=True`` keep only their latest payload per
+    tick, so bursts such as level updates cost a single UI update per frame
+    instead of one ``after`` call each.
+    """
+    _COALESCED = object()
+
+    def __init__(self, root, tick_ms=33):
+        self.root = root
+        self.tick_ms = tick_ms
+        self._handlers = {}
+        self._events = []
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+        self.root.after(self.tick_ms, self._drain)
+
+    def subscribe(self, kind, handler):
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def post(self, kind, payload=None, coalesce=False):
+        with self._lock:
+            if not coalesce:
+                self._events.append((kind, payload))
+            else:
+                if kind not in self._latest:
+                    self._events.append((kind, self._COALESCED))
+                self._latest[kind] = payload
+
+    def stop(self):
+        self._stopped = True
+
+    def _drain(self):
+        if self._stopped:
+            return
+        with self._lock:
+            events, self._events = self._events, []
+            latest, self._latest = self._latest, {}
+        for kind, payload in events:
+            if payload is self._COALESCED:
+                payload = latest[kind]
+            for handler in self._handlers.get(kind, []):
+                try:
+                    handler(payload)
+                except Exception as exc:
+                    print(f"Error handling UI event '{kind}': {exc}")
+        self.root.after(self.tick_ms, self._drain)
+
+
 class RecordingIndicator:
+    """
+    Borderless overlay shown while recording. The panel at the bottom shows
+    the input level, whether the VAD currently hears speech, and the latest
+    transcript text when it is streamed. Level updates are coalesced by the
+    ``UIEventBus``, so it redraws at most once per bus tick.
+
+    After a push-to-talk recording the overlay can stay up in a transcribing
+    state (blue border) so progressively streamed text stays visible.
+    """
+    RECORDING_BORDER = "#FF4D4D"
+    TRANSCRIBING_BORDER = "#4B7BEC"
+
     def __init__(self, root, size=200):
         self.size = size
         self._transparent = "#010203"
@@ -13,13 +81,48 @@ class RecordingIndicator:
         self.window.attributes("-topmost", True)
         self.window.configure(
             bg=self._transparent,
-            highlightbackground="#FF4D4D",
+            highlightbackground=self.RECORDING_BORDER,
             highlightthickness=3
         )
         try:
             self.window.attributes("-transparentcolor", self._transparent)
         except tk.TclError:
             pass
+        self._build_panel()
+
+    def _build_panel(self):
+        inner = self.size - 6
+        self.canvas = tk.Canvas(
+            self.window,
+            width=inner,
+            height=inner,
+            bg=self._transparent,
+            highlightthickness=0,
+            bd=0
+        )
+        self.canvas.pack(fill="both", expand=True)
+        top = inner - 58
+        self.canvas.create_rectangle(6, top, inner - 6, inner - 6, fill="#101216", outline="")
+        self._speech_dot = self.canvas.create_oval(
+            14, top + 8, 24, top + 18, fill="#2A3242", outline=""
+        )
+        self._meter_left = 32
+        self._meter_right = inner - 14
+        self.canvas.create_rectangle(
+            self._meter_left, top + 10, self._meter_right, top + 16, fill="#2A3242", outline=""
+        )
+        self._meter = self.canvas.create_rectangle(
+            self._meter_left, top + 10, self._meter_left, top + 16, fill="#4B7BEC", outline=""
+        )
+        self._text = self.canvas.create_text(
+            14,
+            top + 24,
+            anchor="nw",
+            width=inner - 28,
+            fill="#E7EAF0",
+            font=("Segoe UI", 8),
+            text=""
+        )
 
     def show_indicator(self):
         screen_w = self.window.winfo_screenwidth()
@@ -27,20 +130,52 @@ class RecordingIndicator:
         x = (screen_w - self.size) // 2
         y = (screen_h - self.size) // 2
         self.window.geometry(f"{self.size}x{self.size}+{x}+{y}")
+        self.window.configure(highlightbackground=self.RECORDING_BORDER)
+        self.set_level(0.0, False)
+        self.set_text("")
         self.window.deiconify()
 
+    def show_transcribing(self):
+        # Keeps the overlay and its text, but shows that capture has ended.
+        self.window.configure(highlightbackground=self.TRANSCRIBING_BORDER)
+        self.set_level(0.0, False)
+
     def hide(self):
         self.window.withdraw()
 
+    def set_level(self, rms, is_speech):
+        # Map -60..0 dBFS onto the meter.
+        db = 20 * math.log10(max(rms, 1e-6))
+        fill = min(1.0, max(0.0, (db + 60) / 60))
+        right = self._meter_left + fill * (self._meter_right - self._meter_left)
+        coords = self.canvas.coords(self._meter)
+        self.canvas.coords(self._meter, self._meter_left, coords[1], right, coords[3])
+        self.canvas.itemconfigure(
+            self._speech_dot, fill="#3DDC84" if is_speech else "#2A3242"
+        )
+
+    def set_text(self, text, max_chars=80):
+        if len(text) > max_chars:
+            text = "…" + text[-max_chars:].lstrip()
+        self.canvas.itemconfigure(self._text, text=text)
+
 
 class SettingsWindow(tk.Tk):
+    DEFAULT_DEVICE_LABEL = "System default"
+
     def __init__(self, current_settings):
         super().__init__()
         self._callbacks = {
             "settings_changed": [],
             "restart_requested": [],
-            "close": []
+            "close": [],
+            "history_copy": [],
+            "history_paste": [],
+            "profile_requested": []
         }
+        self._history_source = None
+        self._history_rows = []
+        self._history_refresh = None
         self._colors = {
             "bg": "#101216",
             "card": "#161A22",
@@ -59,6 +194,8 @@ class SettingsWindow(tk.Tk):
         self.minsize(480, 480)
         self._set_icon()
         self.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Settings without a widget (e.g. VAD timings) are carried through as-is.
+        self._base_settings = dict(current_settings)
         self._init_styles()
         self._build_ui(current_settings)
 
@@ -191,6 +328,20 @@ class SettingsWindow(tk.Tk):
         )
         model_combo.pack(fill="x", pady=(6, 0))
 
+        self.inference_process_var = tk.BooleanVar(
+            value=current_settings.get("inference_process", False)
+        )
+        inference_toggle = tk.Checkbutton(
+            model_body,
+            text="Run the model in a separate process",
+            variable=self.inference_process_var,
+            fg=self._colors["text"],
+            bg=self._colors["card"],
+            activebackground=self._colors["card"],
+            selectcolor=self._colors["card"]
+        )
+        inference_toggle.pack(anchor="w", pady=(8, 0))
+
         self._section_label("HOTKEY", parent=content).pack(fill="x", padx=pad_x, pady=(12, 6))
         hotkey_card = self._card(parent=content)
         hotkey_card.pack(fill="x", padx=pad_x)
@@ -229,6 +380,32 @@ class SettingsWindow(tk.Tk):
             font=("Segoe UI", 9)
         ).pack(anchor="w", pady=(6, 0))
 
+        self._section_label("INPUT", parent=content).pack(fill="x", padx=pad_x, pady=(12, 6))
+        input_card = self._card(parent=content)
+        input_card.pack(fill="x", padx=pad_x)
+        input_body = tk.Frame(input_card, bg=self._colors["card"])
+        input_body.pack(fill="x", padx=12, pady=12)
+
+        tk.Label(
+            input_body,
+            text="Microphone",
+            fg=self._colors["text"],
+            bg=self._colors["card"],
+            font=("Segoe UI", 10, "bold")
+        ).pack(anchor="w")
+
+        self.input_device_var = tk.StringVar(
+            value=current_settings.get("input_device") or self.DEFAULT_DEVICE_LABEL
+        )
+        self.input_device_combo = ttk.Combobox(
+            input_body,
+            values=[self.DEFAULT_DEVICE_LABEL],
+            textvariable=self.input_device_var,
+            style="Dark.TCombobox",
+            state="readonly"
+        )
+        self.input_device_combo.pack(fill="x", pady=(6, 0))
+
         self._section_label("BEHAVIOR", parent=content).pack(fill="x", padx=pad_x, pady=(12, 6))
         behavior_card = self._card(parent=content)
         behavior_card.pack(fill="x", padx=pad_x)
@@ -263,6 +440,62 @@ class SettingsWindow(tk.Tk):
         )
         auto_paste.pack(anchor="w")
 
+        self.progressive_var = tk.BooleanVar(
+            value=current_settings.get("progressive_output", False)
+        )
+        progressive_toggle = tk.Checkbutton(
+            behavior_body,
+            text="Paste each sentence as soon as it is transcribed",
+            variable=self.progressive_var,
+            fg=self._colors["text"],
+            bg=self._colors["card"],
+            activebackground=self._colors["card"],
+            selectcolor=self._colors["card"]
+        )
+        progressive_toggle.pack(anchor="w", pady=(6, 0))
+
+        self.continuous_var = tk.BooleanVar(
+            value=current_settings.get("continuous_mode", False)
+        )
+        continuous_toggle = tk.Checkbutton(
+            behavior_body,
+            text="Hands-free mode: hotkey toggles voice-activated dictation",
+            variable=self.continuous_var,
+            fg=self._colors["text"],
+            bg=self._colors["card"],
+            activebackground=self._colors["card"],
+            selectcolor=self._colors["card"]
+        )
+        continuous_toggle.pack(anchor="w", pady=(6, 0))
+
+        tk.Label(
+            behavior_body,
+            text="Output Method",
+            fg=self._colors["text"],
+            bg=self._colors["card"],
+            font=("Segoe UI", 10, "bold")
+        ).pack(anchor="w", pady=(10, 0))
+
+        self.output_backend_var = tk.StringVar(
+            value=current_settings.get("output_backend", "clipboard")
+        )
+        output_combo = ttk.Combobox(
+            behavior_body,
+            values=["clipboard", "type", "auto", "stdout", "file"],
+            textvariable=self.output_backend_var,
+            style="Dark.TCombobox",
+            state="readonly"
+        )
+        output_combo.pack(fill="x", pady=(6, 0))
+
+        tk.Label(
+            behavior_body,
+            text="Clipboard pastes, type sends keystrokes, auto types short phrases.",
+            fg=self._colors["muted"],
+            bg=self._colors["card"],
+            font=("Segoe UI", 9)
+        ).pack(anchor="w", pady=(6, 0))
+
         tk.Label(
             behavior_body,
             text="Transcription Language",
@@ -361,6 +594,57 @@ class SettingsWindow(tk.Tk):
         self.ai_fields = [self.model_entry, self.system_prompt_text]
         self._toggle_ai_fields()
 
+        self._section_label("HISTORY", parent=content).pack(fill="x", padx=pad_x, pady=(12, 6))
+        history_card = self._card(parent=content)
+        history_card.pack(fill="x", padx=pad_x)
+        history_body = tk.Frame(history_card, bg=self._colors["card"])
+        history_body.pack(fill="x", padx=12, pady=12)
+
+        self.history_query_var = tk.StringVar()
+        self.history_query_var.trace_add("write", lambda *_args: self._schedule_history_refresh())
+        history_entry = tk.Entry(
+            history_body,
+            textvariable=self.history_query_var,
+            fg=self._colors["text"],
+            bg=self._colors["entry"],
+            insertbackground=self._colors["text"],
+            relief="flat",
+            highlightthickness=1,
+            highlightbackground=self._colors["border"],
+            highlightcolor=self._colors["accent"]
+        )
+        history_entry.pack(fill="x", ipady=6)
+
+        self.history_list = tk.Listbox(
+            history_body,
+            height=6,
+            fg=self._colors["text"],
+            bg=self._colors["entry"],
+            selectbackground=self._colors["accent"],
+            relief="flat",
+            highlightthickness=1,
+            highlightbackground=self._colors["border"],
+            activestyle="none",
+            font=("Segoe UI", 9)
+        )
+        self.history_list.pack(fill="x", pady=(6, 0))
+        self.history_list.bind("<Double-Button-1>", lambda _event: self._use_history("history_paste"))
+
+        history_buttons = tk.Frame(history_body, bg=self._colors["card"])
+        history_buttons.pack(fill="x", pady=(6, 0))
+        for column, (label, kind) in enumerate((("Copy", "history_copy"), ("Paste", "history_paste"))):
+            tk.Button(
+                history_buttons,
+                text=label,
+                command=lambda kind=kind: self._use_history(kind),
+                fg=self._colors["text"],
+                bg=self._colors["button"],
+                activebackground=self._colors["button_hover"],
+                relief="flat",
+                padx=12,
+                pady=4
+            ).pack(side="left", padx=(0 if column == 0 else 8, 0))
+
         footer = tk.Label(
             content,
             text="Hotkey and model changes take effect after restart.",
@@ -374,6 +658,19 @@ class SettingsWindow(tk.Tk):
         button_row.pack(fill="x", padx=pad_x, pady=(12, 16))
         button_row.columnconfigure(0, weight=1)
 
+        profile_button = tk.Button(
+            button_row,
+            text="Profile",
+            command=self._request_profile,
+            fg=self._colors["muted"],
+            bg=self._colors["bg"],
+            activebackground=self._colors["button_hover"],
+            relief="flat",
+            padx=8,
+            pady=6
+        )
+        profile_button.grid(row=0, column=0, sticky="w")
+
         save_button = tk.Button(
             button_row,
             text="Save",
@@ -421,6 +718,9 @@ class SettingsWindow(tk.Tk):
             highlightthickness=1
         )
 
+    def set_input_devices(self, names):
+        self.input_device_combo.configure(values=[self.DEFAULT_DEVICE_LABEL] + list(names))
+
     def bind_settings_changed(self, callback):
         self._callbacks["settings_changed"].append(callback)
 
@@ -430,20 +730,75 @@ class SettingsWindow(tk.Tk):
     def bind_close(self, callback):
         self._callbacks["close"].append(callback)
 
+    def bind_profile_requested(self, callback):
+        self._callbacks["profile_requested"].append(callback)
+
+    def _request_profile(self):
+        for callback in self._callbacks["profile_requested"]:
+            callback()
+
+    def bind_history_copy(self, callback):
+        self._callbacks["history_copy"].append(callback)
+
+    def bind_history_paste(self, callback):
+        self._callbacks["history_paste"].append(callback)
+
+    def set_history_source(self, search):
+        """
+        Sets the function used to fill the history list. It is called with the
+        search text and returns records with ``created_at`` and ``text``.
+        """
+        self._history_source = search
+        self.refresh_history()
+
+    def refresh_history(self):
+        self._history_refresh = None
+        if self._history_source is None:
+            return
+        self._history_rows = self._history_source(self.history_query_var.get())
+        self.history_list.delete(0, "end")
+        for row in self._history_rows:
+            stamp = time.strftime("%d %b %H:%M", time.localtime(row["created_at"]))
+            self.history_list.insert("end", f"{stamp}  {' '.join(row['text'].split())}")
+
+    def _schedule_history_refresh(self, delay_ms=150):
+        # Searching on every keystroke would run a query per character typed.
+        if self._history_refresh is not None:
+            self.after_cancel(self._history_refresh)
+        self._history_refresh = self.after(delay_ms, self.refresh_history)
+
+    def _use_history(self, kind):
+        selection = self.history_list.curselection()
+        if not selection:
+            return
+        text = self._history_rows[selection[0]]["text"]
+        for callback in self._callbacks[kind]:
+            callback(text)
+
     def get_current_settings(self):
         language = self.lang_var.get().strip()
         if not language:
             language = None
-        return {
+        input_device = self.input_device_var.get()
+        if input_device == self.DEFAULT_DEVICE_LABEL:
+            input_device = None
+        settings = dict(self._base_settings)
+        settings.update({
             "model_size": self.model_var.get(),
+            "inference_process": self.inference_process_var.get(),
             "hotkey": self.hotkey_var.get(),
             "auto_paste": self.auto_paste_var.get(),
             "play_sounds": self.sound_var.get(),
             "language": language,
+            "input_device": input_device,
+            "output_backend": self.output_backend_var.get(),
+            "progressive_output": self.progressive_var.get(),
+            "continuous_mode": self.continuous_var.get(),
             "ai_enabled": self.ai_enabled_var.get(),
             "ai_model": self.model_name_var.get(),
             "ai_system_prompt": self.system_prompt_text.get("1.0", "end-1c").strip()
-        }
+        })
+        return settings
 
     def save_settings(self):
         new_settings = self.get_current_settings()
@@ -460,6 +815,7 @@ class SettingsWindow(tk.Tk):
     def show(self):
         self.deiconify()
         self.lift()
+        self.refresh_history()
 
     def show_error(self, title, message):
         messagebox.showerror(title, message, parent=self)